@@ -2,21 +2,38 @@
 main.py — PRECOG-Edge  Steps 1 + 2 + 3 + 4 + 5 + 6 (FINAL)
 Sensor → State Estimation → Prediction → Safety Decision → Robot Actuator → Demo UI
 
+Runs as three threads: capture → compute → display (main thread).
+
 Controls:
   ESC / Q  → quit
   M        → toggle Motion Mask window
   R        → reset robot to start position
 """
 
+import queue
+import threading
+
 import cv2
 import numpy as np
 from tracker         import MotionTracker
 from state_estimator import StateEstimator
-from predictor       import TrajectoryPredictor, draw_trajectory
+from predictor       import BatchTrajectoryPredictor, draw_trajectory
 from safety          import SafetyMonitor
 
 # ── Configuration ─────────────────────────────────────────────────────────────
 CAMERA_INDEX  = 0
+# Optional GStreamer pipeline (overrides CAMERA_INDEX). On Jetson/NVIDIA
+# targets this hands decode/convert to hardware; appsink drop=1
+# max-buffers=1 always delivers the latest frame instead of queueing.
+#   USB / CSI camera:
+#     "v4l2src device=/dev/video0 ! video/x-raw,width=640,height=480 ! "
+#     "nvvidconv ! video/x-raw,format=BGRx ! videoconvert ! "
+#     "video/x-raw,format=BGR ! appsink drop=1 max-buffers=1"
+#   MP4 file (NVDEC):
+#     "filesrc location=demo.mp4 ! qtdemux ! h264parse ! nvv4l2decoder ! "
+#     "nvvidconv ! video/x-raw,format=BGRx ! videoconvert ! "
+#     "video/x-raw,format=BGR ! appsink drop=1 max-buffers=1"
+CAMERA_PIPELINE = None
 SPEED_HIGH    = 8.0
 VEL_SCALE     = 5
 HORIZON       = 40
@@ -25,9 +42,14 @@ ROBOT_SPEED   = 3
 # ──────────────────────────────────────────────────────────────────────────────
 
 
+# Speed → BGR lookup table: 256 bins spanning 0 … SPEED_HIGH (clamped above).
+# Plain tuples, so a lookup hands cv2 its color with no conversion.
+_SPEED_LUT = [(0, int(255 * (1 - t * 0.7)), int(255 * t))
+              for t in (i / 255.0 for i in range(256))]
+
+
 def speed_color(speed):
-    t = min(speed / SPEED_HIGH, 1.0)
-    return (0, int(255 * (1 - t * 0.7)), int(255 * t))
+    return _SPEED_LUT[min(int(speed * 256 / SPEED_HIGH), 255)]
 
 
 def draw_tracks(frame, states):
@@ -77,17 +99,75 @@ def draw_robot(frame, robot_x, robot_y, danger):
                         (0, 220, 220), 2, tipLength=0.4)
 
 
+# ── Static UI layers ──────────────────────────────────────────────────────────
+# The title banner and legend never change, so each strip is baked once per
+# frame size into per-pixel (scale, offset) such that
+#     strip * scale + offset  ==  background blend, then text / icons on top
+# and applied with a single fused NumPy pass per frame.
+
+TITLE_TEXT = "PRECOG EDGE  —  Predictive Physical Intelligence Engine"
+
+LEGEND_ITEMS = [
+    ((0,  255, 0),   "GREEN box  =  Detected object"),
+    ((255, 165, 0),  "ORANGE arrow  =  Velocity estimate"),
+    ((0,  255, 255), "CYAN dots  =  Predicted future trajectory"),
+    ((0,  220, 220), "TEAL circle  =  Protected robot workspace"),
+]
+
+_STATIC_UI: dict[tuple[int, int], dict] = {}
+
+
+def _paint_title(img, color=None):
+    cv2.putText(img, TITLE_TEXT, (14, 25),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.62, color or (255, 255, 255), 1, cv2.LINE_AA)
+
+
+def _paint_legend(img, color=None):
+    # strip-local coordinates: strip starts at h_img - 110
+    for i, (item_color, text) in enumerate(LEGEND_ITEMS):
+        y = 20 + i * 22
+        cv2.circle(img, (18, y - 4), 6, color or item_color, -1)
+        cv2.putText(img, text, (32, y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.44, color or item_color, 1, cv2.LINE_AA)
+
+
+def _bake_strip(w_img, y0, y1, bg_color, alpha, paint):
+    """Precompute (y0, y1, scale, offset) for one static strip."""
+    rows  = y1 - y0
+    fg    = np.zeros((rows, w_img, 3), np.uint8)
+    cover = np.zeros((rows, w_img), np.uint8)
+    paint(fg)                 # colored, anti-aliased over black = color * coverage
+    paint(cover, (255,))      # coverage only
+
+    a_fg   = cover.astype(np.float32)[..., None] / 255.0
+    scale  = (1.0 - alpha) * (1.0 - a_fg)
+    offset = alpha * np.float32(bg_color) * (1.0 - a_fg) + fg + 0.5   # +0.5 → round
+    np.minimum(offset, 255.5 - 255.0 * scale, out=offset)             # never overflow
+    return y0, y1, scale.astype(np.float32), offset.astype(np.float32)
+
+
+def _static_ui(h_img, w_img):
+    ui = _STATIC_UI.get((h_img, w_img))
+    if ui is None:
+        ui = _STATIC_UI[(h_img, w_img)] = {
+            "title":  _bake_strip(w_img, 0, min(37, h_img),
+                                  (10, 10, 30), 0.75, _paint_title),
+            "legend": _bake_strip(w_img, max(h_img - 110, 0), h_img,
+                                  (0, 0, 0), 0.6, _paint_legend),
+        }
+    return ui
+
+
+def _apply_strip(frame, strip):
+    y0, y1, scale, offset = strip
+    region = frame[y0:y1]
+    np.copyto(region, region * scale + offset, casting="unsafe")
+
+
 def draw_title_banner(frame):
     """Top title — makes it look like a real product prototype."""
     h_img, w_img = frame.shape[:2]
-    overlay = frame.copy()
-    cv2.rectangle(overlay, (0, 0), (w_img, 36), (10, 10, 30), -1)
-    cv2.addWeighted(overlay, 0.75, frame, 0.25, 0, frame)
-
-    cv2.putText(frame,
-                "PRECOG EDGE  —  Predictive Physical Intelligence Engine",
-                (14, 25),
-                cv2.FONT_HERSHEY_SIMPLEX, 0.62, (255, 255, 255), 1, cv2.LINE_AA)
+    _apply_strip(frame, _static_ui(h_img, w_img)["title"])
 
 
 def draw_prediction_timer(frame, n_future_points: int):
@@ -102,30 +182,20 @@ def draw_prediction_timer(frame, n_future_points: int):
 def draw_legend(frame):
     """Bottom legend — judges understand every element without asking."""
     h_img, w_img = frame.shape[:2]
-    overlay = frame.copy()
-    cv2.rectangle(overlay, (0, h_img - 110), (w_img, h_img), (0, 0, 0), -1)
-    cv2.addWeighted(overlay, 0.6, frame, 0.4, 0, frame)
+    _apply_strip(frame, _static_ui(h_img, w_img)["legend"])
 
-    items = [
-        ((0,  255, 0),   "GREEN box  =  Detected object"),
-        ((255, 165, 0),  "ORANGE arrow  =  Velocity estimate"),
-        ((0,  255, 255), "CYAN dots  =  Predicted future trajectory"),
-        ((0,  220, 220), "TEAL circle  =  Protected robot workspace"),
-    ]
 
-    for i, (color, text) in enumerate(items):
-        y = h_img - 90 + i * 22
-        cv2.circle(frame, (18, y - 4), 6, color, -1)
-        cv2.putText(frame, text, (32, y),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.44, color, 1, cv2.LINE_AA)
+def _blend_strip(frame, y0, y1, bg_color, alpha):
+    """frame[y0:y1] = frame * (1 - alpha) + bg_color * alpha, in place."""
+    region = frame[y0:y1]
+    np.copyto(region, region * np.float32(1.0 - alpha)
+              + (np.float32(bg_color) * np.float32(alpha) + 0.5),   # +0.5 → round
+              casting="unsafe")
 
 
 def draw_status_bar(frame, states, events):
     """Second bar — live telemetry snapshot."""
-    h_img, w_img = frame.shape[:2]
-    overlay = frame.copy()
-    cv2.rectangle(overlay, (0, 36), (w_img, 72), (0, 0, 0), -1)
-    cv2.addWeighted(overlay, 0.45, frame, 0.55, 0, frame)
+    _blend_strip(frame, 36, 73, (0, 0, 0), 0.45)
 
     if events:
         soonest = events[0]
@@ -140,101 +210,195 @@ def draw_status_bar(frame, states, events):
                 cv2.FONT_HERSHEY_SIMPLEX, 0.52, color, 1, cv2.LINE_AA)
 
 
-def main():
-    SHOW_MASK = True
+# ── Pipeline stages ───────────────────────────────────────────────────────────
+# capture thread → [cap_q] → compute thread → [disp_q] → main (display)
+# HighGUI stays on the main thread (required by the Cocoa and Qt backends).
+# Both queues hold a single item; a new item replaces a stale one, so a slow
+# stage drops frames instead of building up latency. Any stage that exits —
+# normally or with an exception — sets `stop`, shutting the others down.
+
+def _put_latest(q: queue.Queue, item):
+    """Put into a single-slot queue, discarding whatever is still waiting."""
+    try:
+        q.get_nowait()
+    except queue.Empty:
+        pass
+    try:
+        q.put_nowait(item)
+    except queue.Full:
+        pass
+
+
+def _capture_worker(cap, cap_q: queue.Queue, stop: threading.Event):
+    """Stage 1 — blocking camera reads, always keeping only the newest frame."""
+    try:
+        while not stop.is_set():
+            ret, frame = cap.read()
+            if not ret:
+                continue
+            _put_latest(cap_q, frame)
+    finally:
+        stop.set()
+
+
+def _compute_worker(cap_q: queue.Queue, disp_q: queue.Queue,
+                    key_q: queue.Queue, stop: threading.Event,
+                    h_frame: int, w_frame: int):
+    """Stage 2 — detection → estimation → prediction → safety → drawing."""
+    try:
+        SHOW_MASK   = True
+        zone_center = (w_frame // 2, h_frame // 2)
+
+        tracker    = MotionTracker()
+        estimator  = StateEstimator(max_distance=80.0)
+        safety     = SafetyMonitor(zone_center=zone_center, radius=ZONE_RADIUS)
+        predictor  = BatchTrajectoryPredictor(history_len=8, horizon=HORIZON)
+
+        robot_x   = 20
+        robot_y   = h_frame - 55
+        robot_dir = 1
+
+        total_future_pts = 0   # for prediction timer
+
+        while not stop.is_set():
+            # ── Keyboard (forwarded from the display loop) ────────────────────
+            while not key_q.empty():
+                key = key_q.get_nowait()
+                if key == ord("m"):
+                    SHOW_MASK = not SHOW_MASK
+                elif key == ord("r"):
+                    robot_x, robot_dir = 20, 1
+
+            try:
+                frame = cap_q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+            # ── Step 1: Detection ─────────────────────────────────────────────
+            detections, mask = tracker.detect(frame, return_mask=SHOW_MASK)
+
+            # ── Step 2: State estimation ──────────────────────────────────────
+            states = estimator.update(detections)
+
+            # ── Step 3: Trajectory prediction ─────────────────────────────────
+            total_future_pts = HORIZON      # always show full horizon on timer
+
+            track_ids = [s["id"] for s in states]
+            futures   = predictor.update_and_predict_batch(
+                track_ids,
+                [s["cx"] for s in states], [s["cy"] for s in states],
+                [s["vx"] for s in states], [s["vy"] for s in states],
+            )                               # (T, HORIZON, 2); dead ids are dropped
+            for future in futures:
+                draw_trajectory(frame, future)
+
+            # ── Step 4: Safety decision ───────────────────────────────────────
+            events = safety.check_batch(track_ids, futures)
+            danger = len(events) > 0
+
+            safety.draw_zone(frame, events)
+
+            # ── Step 5: Robot actuator ────────────────────────────────────────
+            if not danger:
+                robot_x += ROBOT_SPEED * robot_dir
+                if robot_x + 80 >= w_frame - 10:
+                    robot_dir = -1
+                elif robot_x <= 10:
+                    robot_dir = 1
+
+            draw_robot(frame, robot_x, robot_y, danger)
+
+            # ── Step 6: Demo UI overlays ──────────────────────────────────────
+            draw_tracks(frame, states)
+            draw_title_banner(frame)
+            draw_prediction_timer(frame, total_future_pts)
+            draw_status_bar(frame, states, events)
+            draw_legend(frame)
+
+            _put_latest(disp_q, (frame, mask))
+    finally:
+        stop.set()
+
+
+def _display_loop(disp_q: queue.Queue, key_q: queue.Queue, stop: threading.Event):
+    """
+    Stage 3 — runs on the main thread; all HighGUI calls (imshow / pollKey /
+    waitKey) live here. After showing a frame, keys are read with the
+    non-blocking cv2.pollKey (OpenCV ≥ 4.5.3); the ≥1 ms waitKey(1) is only
+    used when idle or on older OpenCV builds. Quit is handled here, other
+    keys are forwarded to the compute thread.
+    """
+    poll_key = getattr(cv2, "pollKey", None)
+    mask_shown = False
+    try:
+        while not stop.is_set():
+            try:
+                frame, mask = disp_q.get(timeout=0.01)
+            except queue.Empty:
+                frame = None
+
+            if frame is not None:
+                cv2.imshow("PRECOG EDGE", frame)
+                if mask is not None:
+                    cv2.imshow("Motion Mask", mask)
+                    mask_shown = True
+                elif mask_shown:
+                    cv2.destroyWindow("Motion Mask")
+                    mask_shown = False
+                key = poll_key() if poll_key else cv2.waitKey(1)
+            else:
+                key = cv2.waitKey(1)       # idle — let the GUI process events
+
+            key &= 0xFF
+            if key in (27, ord("q")):
+                break
+            elif key != 0xFF:
+                key_q.put(key)
+    finally:
+        stop.set()
+        cv2.destroyAllWindows()
+
 
-    cap = cv2.VideoCapture(CAMERA_INDEX)
-    if not cap.isOpened():
-        print(f"[ERROR] Camera {CAMERA_INDEX} not found. Try CAMERA_INDEX 1 or 2.")
-        return
+def main():
+    if CAMERA_PIPELINE:
+        cap = cv2.VideoCapture(CAMERA_PIPELINE, cv2.CAP_GSTREAMER)
+        if not cap.isOpened():
+            print("[ERROR] GStreamer pipeline failed to open. "
+                  "Check CAMERA_PIPELINE and that OpenCV was built with GStreamer.")
+            return
+    else:
+        cap = cv2.VideoCapture(CAMERA_INDEX)
+        if not cap.isOpened():
+            print(f"[ERROR] Camera {CAMERA_INDEX} not found. Try CAMERA_INDEX 1 or 2.")
+            return
 
     ret, test_frame = cap.read()
     h_frame = test_frame.shape[0] if ret else 480
     w_frame = test_frame.shape[1] if ret else 640
-    zone_center = (w_frame // 2, h_frame // 2)
-
-    tracker    = MotionTracker()
-    estimator  = StateEstimator(max_distance=80.0)
-    safety     = SafetyMonitor(zone_center=zone_center, radius=ZONE_RADIUS)
-    predictors: dict[int, TrajectoryPredictor] = {}
-
-    robot_x   = 20
-    robot_y   = h_frame - 55
-    robot_dir = 1
-
-    total_future_pts = 0   # for prediction timer
 
     print("[INFO] PRECOG EDGE — Full demo active.")
     print("[INFO] ESC/Q=quit  M=mask  R=reset robot")
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            continue
-
-        # ── Step 1: Detection ─────────────────────────────────────────────────
-        detections, mask = tracker.detect(frame)
-
-        # ── Step 2: State estimation ──────────────────────────────────────────
-        states = estimator.update(detections)
-
-        # ── Step 3: Trajectory prediction ─────────────────────────────────────
-        track_futures: dict[int, list] = {}
-        total_future_pts = HORIZON      # always show full horizon on timer
-
-        for s in states:
-            tid = s["id"]
-            if tid not in predictors:
-                predictors[tid] = TrajectoryPredictor(history_len=8, horizon=HORIZON)
-            future = predictors[tid].update_and_predict(
-                s["cx"], s["cy"], s["vx"], s["vy"]
-            )
-            track_futures[tid] = future
-            draw_trajectory(frame, future)
-
-        for dead in [k for k in predictors if k not in {s["id"] for s in states}]:
-            del predictors[dead]
-
-        # ── Step 4: Safety decision ───────────────────────────────────────────
-        events = safety.check_all(track_futures)
-        danger = len(events) > 0
-
-        safety.draw_zone(frame, events)
-
-        # ── Step 5: Robot actuator ────────────────────────────────────────────
-        if not danger:
-            robot_x += ROBOT_SPEED * robot_dir
-            if robot_x + 80 >= w_frame - 10:
-                robot_dir = -1
-            elif robot_x <= 10:
-                robot_dir = 1
-
-        draw_robot(frame, robot_x, robot_y, danger)
-
-        # ── Step 6: Demo UI overlays ──────────────────────────────────────────
-        draw_tracks(frame, states)
-        draw_title_banner(frame)
-        draw_prediction_timer(frame, total_future_pts)
-        draw_status_bar(frame, states, events)
-        draw_legend(frame)
-
-        cv2.imshow("PRECOG EDGE", frame)
-        if SHOW_MASK:
-            cv2.imshow("Motion Mask", mask)
-
-        key = cv2.waitKey(1) & 0xFF
-        if key in (27, ord("q")):
-            break
-        elif key == ord("m"):
-            SHOW_MASK = not SHOW_MASK
-            if not SHOW_MASK:
-                cv2.destroyWindow("Motion Mask")
-        elif key == ord("r"):
-            robot_x, robot_dir = 20, 1
-
-    cap.release()
-    cv2.destroyAllWindows()
-    print("[INFO] PRECOG EDGE shut down.")
+    cap_q  = queue.Queue(maxsize=1)
+    disp_q = queue.Queue(maxsize=1)
+    key_q  = queue.Queue()
+    stop   = threading.Event()
+
+    capture_thread = threading.Thread(target=_capture_worker,
+                                      args=(cap, cap_q, stop), daemon=True)
+    compute_thread = threading.Thread(target=_compute_worker,
+                                      args=(cap_q, disp_q, key_q, stop,
+                                            h_frame, w_frame), daemon=True)
+    capture_thread.start()
+    compute_thread.start()
+
+    try:
+        _display_loop(disp_q, key_q, stop)
+    finally:
+        compute_thread.join()
+        capture_thread.join(timeout=1.0)
+        cap.release()
+        print("[INFO] PRECOG EDGE shut down.")
 
 
 if __name__ == "__main__":
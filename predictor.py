@@ -7,10 +7,17 @@ Two models:
   2. Quadratic — constant acceleration estimated from velocity history
                  (better for curved / decelerating motion)
 
-Both return a list of (x, y) predicted positions for the next `horizon` frames.
+predict_linear returns a list of (x, y) positions; TrajectoryPredictor returns
+a float32 (horizon, 2) array of positions for the next `horizon` frames.
+BatchTrajectoryPredictor runs model 2 for every track at once and returns
+a float32 (tracks, horizon, 2) array.
+
+TrajectoryPredictor's extrapolation kernel is JIT-compiled with numba if it
+is installed, on first use only, so importing this module (and the batch
+path) never pays for numba.
 """
 
-from collections import deque
+from functools import lru_cache
 import numpy as np
 
 
@@ -28,6 +35,30 @@ def predict_linear(cx: float, cy: float,
 
 # ── Model 2: Constant-acceleration quadratic extrapolation ────────────────────
 
+def _extrap_py(cx, cy, vx, vy, ax, ay, horizon, out):
+    """Fill out[:horizon] with quadratic positions for t = 1 … horizon."""
+    for i in range(horizon):
+        t = i + 1
+        out[i, 0] = cx + vx * t + 0.5 * ax * t * t
+        out[i, 1] = cy + vy * t + 0.5 * ay * t * t
+
+
+_extrap = None   # resolved by _get_extrap() on first use
+
+
+def _get_extrap():
+    """Numba-compiled _extrap_py if numba is available, else the Python one."""
+    global _extrap
+    if _extrap is None:
+        try:
+            from numba import njit
+        except ImportError:                  # pure-Python fallback, same results
+            _extrap = _extrap_py
+        else:
+            _extrap = njit(cache=True, fastmath=True)(_extrap_py)
+    return _extrap
+
+
 class TrajectoryPredictor:
     """
     Per-track predictor that maintains a short velocity history to estimate
@@ -42,48 +73,159 @@ class TrajectoryPredictor:
     def __init__(self, history_len: int = 8, horizon: int = 30):
         self.horizon     = horizon
         self.history_len = history_len
-        # velocity history for acceleration estimation
-        self._vx_hist: deque[float] = deque(maxlen=history_len)
-        self._vy_hist: deque[float] = deque(maxlen=history_len)
+        # velocity history for acceleration estimation (ring buffer)
+        self._vx_ring: list[float] = [0.0] * history_len
+        self._vy_ring: list[float] = [0.0] * history_len
+        self._idx   = 0   # next slot to write
+        self._count = 0   # samples held, ≤ history_len
 
     def update_and_predict(self,
                            cx: float, cy: float,
                            vx: float, vy: float
-                           ) -> list[tuple[float, float]]:
+                           ) -> np.ndarray:
         """
         Call once per frame with the Kalman-estimated state.
-        Returns horizon predicted (x, y) positions.
+        Returns a float32 (horizon, 2) array of predicted (x, y) positions.
         """
-        self._vx_hist.append(vx)
-        self._vy_hist.append(vy)
+        n = self.history_len
+        self._vx_ring[self._idx] = vx
+        self._vy_ring[self._idx] = vy
+        self._idx   = (self._idx + 1) % n
+        self._count = min(self._count + 1, n)
+
+        # Need ≥2 samples to estimate acceleration (linear until then)
+        ax = ay = 0.0
+        if self._count >= 2:
+            # Average acceleration over recent history. mean(diff(v))
+            # telescopes to (newest - oldest) / (count - 1).
+            oldest = self._idx if self._count == n else 0
+            ax = (vx - self._vx_ring[oldest]) / (self._count - 1)
+            ay = (vy - self._vy_ring[oldest]) / (self._count - 1)
+
+            # Clamp acceleration to dampen instability
+            MAX_A = 2.0
+            ax = max(-MAX_A, min(MAX_A, ax))
+            ay = max(-MAX_A, min(MAX_A, ay))
+
+        out = np.empty((self.horizon, 2), np.float32)
+        _get_extrap()(float(cx), float(cy), float(vx), float(vy),
+                ax, ay, self.horizon, out)
+        return out
+
+
+# ── Model 2, batched: all tracks in one vectorized pass ───────────────────────
+
+class BatchTrajectoryPredictor:
+    """
+    Structure-of-arrays version of TrajectoryPredictor for all live tracks.
 
-        # Need ≥2 samples to estimate acceleration
-        if len(self._vx_hist) < 2:
-            return predict_linear(cx, cy, vx, vy, self.horizon)
+    Each track id owns a column ("slot") of a (history_len, max_tracks)
+    velocity ring buffer shared by all tracks, so one NumPy expression
+    produces every track's quadratic trajectory per frame. Ids missing from
+    a call are considered dead and their slots are recycled.
+    """
 
-        # Average acceleration over recent history
-        vx_arr = np.array(self._vx_hist)
-        vy_arr = np.array(self._vy_hist)
-        ax = float(np.mean(np.diff(vx_arr)))
-        ay = float(np.mean(np.diff(vy_arr)))
+    MAX_A = 2.0   # acceleration clamp (same as TrajectoryPredictor)
 
-        # Clamp acceleration to dampen instability
-        MAX_A = 2.0
-        ax = np.clip(ax, -MAX_A, MAX_A)
-        ay = np.clip(ay, -MAX_A, MAX_A)
+    def __init__(self, history_len: int = 8, horizon: int = 30,
+                 max_tracks: int = 64):
+        self.horizon     = horizon
+        self.history_len = history_len
+        self.vx_ring = np.zeros((history_len, max_tracks), np.float32)
+        self.vy_ring = np.zeros((history_len, max_tracks), np.float32)
+        self.count   = np.zeros(max_tracks, np.int64)  # samples held per slot
+        self.idx     = 0                                # last ring row written
+        self.tid_to_slot: dict[int, int] = {}
+        self._free   = list(range(max_tracks - 1, -1, -1))
+        self._t      = np.arange(1, horizon + 1, dtype=np.float32)
+
+    def _grow(self):
+        old = self.vx_ring.shape[1]
+        pad = ((0, 0), (0, old))
+        self.vx_ring = np.pad(self.vx_ring, pad)
+        self.vy_ring = np.pad(self.vy_ring, pad)
+        self.count   = np.pad(self.count, (0, old))
+        self._free   = list(range(2 * old - 1, old - 1, -1))
+
+    def _slots_for(self, ids: list[int]) -> np.ndarray:
+        live = set(ids)
+        for tid in [t for t in self.tid_to_slot if t not in live]:
+            slot = self.tid_to_slot.pop(tid)
+            self.count[slot] = 0
+            self._free.append(slot)
+
+        slots = np.empty(len(ids), np.intp)
+        for i, tid in enumerate(ids):
+            slot = self.tid_to_slot.get(tid)
+            if slot is None:
+                if not self._free:
+                    self._grow()
+                slot = self.tid_to_slot[tid] = self._free.pop()
+            slots[i] = slot
+        return slots
+
+    def update_and_predict_batch(self, ids: list[int],
+                                 cx, cy, vx, vy) -> np.ndarray:
+        """
+        Call once per frame with the Kalman-estimated state of every live
+        track (cx, cy, vx, vy are length-T sequences aligned with ids).
+        Returns a float32 (T, horizon, 2) array of predicted (x, y) positions.
+        """
+        slots = self._slots_for(ids)
+        out   = np.empty((len(ids), self.horizon, 2), np.float32)
+        if len(ids) == 0:
+            return out
+
+        cx = np.asarray(cx, np.float32)
+        cy = np.asarray(cy, np.float32)
+        vx = np.asarray(vx, np.float32)
+        vy = np.asarray(vy, np.float32)
+
+        n = self.history_len
+        self.idx = (self.idx + 1) % n
+        self.vx_ring[self.idx, slots] = vx
+        self.vy_ring[self.idx, slots] = vy
+        count = np.minimum(self.count[slots] + 1, n)
+        self.count[slots] = count
+
+        # mean(diff(v)) over the window = (newest - oldest) / (count - 1);
+        # linear (a = 0) until a track has ≥2 samples
+        oldest = (self.idx - (count - 1)) % n
+        denom  = np.maximum(count - 1, 1).astype(np.float32)
+        ax = np.where(count >= 2, (vx - self.vx_ring[oldest, slots]) / denom, 0.0)
+        ay = np.where(count >= 2, (vy - self.vy_ring[oldest, slots]) / denom, 0.0)
+        np.clip(ax, -self.MAX_A, self.MAX_A, out=ax)
+        np.clip(ay, -self.MAX_A, self.MAX_A, out=ay)
+
+        t  = self._t
+        tt = 0.5 * t * t
+        out[..., 0] = cx[:, None] + vx[:, None] * t + ax[:, None] * tt
+        out[..., 1] = cy[:, None] + vy[:, None] * t + ay[:, None] * tt
+        return out
 
-        pts = []
-        for t in range(1, self.horizon + 1):
-            px = cx + vx * t + 0.5 * ax * t * t
-            py = cy + vy * t + 0.5 * ay * t * t
-            pts.append((px, py))
 
-        return pts
+# ── Drawing helper ────────────────────────────────────────────────────────────
 
+@lru_cache(maxsize=16)
+def _dot_style(n: int, step: int,
+               color_start: tuple, color_end: tuple,
+               dot_radius: int) -> tuple:
+    """
+    (color, radius) for every drawn dot of an n-point trajectory.
+    Depends only on the arguments, so it is built once and reused each frame.
+    """
+    style = []
+    for i in range(0, n, step):
+        t   = i / max(n - 1, 1)                   # 0 → 1
+        r   = int(color_start[0] + t * (color_end[0] - color_start[0]))
+        g   = int(color_start[1] + t * (color_end[1] - color_start[1]))
+        b_c = int(color_start[2] + t * (color_end[2] - color_start[2]))
+        radius = max(1, int(dot_radius * (1 - t * 0.6)))
+        style.append(((r, g, b_c), radius))
+    return tuple(style)
 
-# ── Drawing helper ────────────────────────────────────────────────────────────
 
-def draw_trajectory(frame, points: list[tuple[float, float]],
+def draw_trajectory(frame, points,
                     color_start=(0, 255, 255),   # cyan near object
                     color_end=(0, 80, 200),       # dark-blue far out
                     dot_radius: int = 3,
@@ -92,24 +234,20 @@ def draw_trajectory(frame, points: list[tuple[float, float]],
     Draw predicted trajectory as fading dots on frame.
 
     Args:
-        points    : list of (x, y) in frame-order (nearest → furthest)
+        points    : (N, 2) array or list of (x, y) in frame-order
+                    (nearest → furthest)
         color_start / color_end : BGR colors to interpolate between
         dot_radius : pixel radius of each dot
         step      : draw every Nth point (reduces visual clutter)
     """
-    n = len(points)
-    for i in range(0, n, step):
-        t   = i / max(n - 1, 1)                   # 0 → 1
-        r   = int(color_start[0] + t * (color_end[0] - color_start[0]))
-        g   = int(color_start[1] + t * (color_end[1] - color_start[1]))
-        b_c = int(color_start[2] + t * (color_end[2] - color_start[2]))
-        alpha = max(0.15, 1.0 - t * 0.85)          # fade out
-        radius = max(1, int(dot_radius * (1 - t * 0.6)))
+    style = _dot_style(len(points), step,
+                       tuple(color_start), tuple(color_end), dot_radius)
+    pts   = np.asarray(points)[::step].astype(np.int32).tolist()
 
-        px, py = int(points[i][0]), int(points[i][1])
-        h_img, w_img = frame.shape[:2]
+    h_img, w_img = frame.shape[:2]
+    for (px, py), (color, radius) in zip(pts, style):
         if 0 <= px < w_img and 0 <= py < h_img:
-            cv2.circle(frame, (px, py), radius, (r, g, b_c), -1)
+            cv2.circle(frame, (px, py), radius, color, -1)
 
 
 # Only import cv2 at usage time to avoid circular issues at module level
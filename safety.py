@@ -11,7 +11,6 @@ This is the core concept behind:
   - Missile intercept prediction
 """
 
-import math
 import cv2
 import numpy as np
 from dataclasses import dataclass
@@ -37,12 +36,13 @@ class SafetyMonitor:
                  radius: int = 120):
         self.zone_center = zone_center
         self.radius      = radius
+        self._scratch    = None   # reused overlay buffer for alpha blends
 
     # ── Core check ───────────────────────────────────────────────────────────
 
     def check_track(self,
                     track_id: int,
-                    future_points: list[tuple[float, float]]
+                    future_points
                     ) -> CollisionEvent | None:
         """
         Check one track's predicted trajectory against the zone.
@@ -50,43 +50,95 @@ class SafetyMonitor:
         Returns a CollisionEvent if any future point is inside the zone,
         else None.
         """
-        cx, cy = self.zone_center
-
-        for i, (fx, fy) in enumerate(future_points):
-            dist = math.hypot(fx - cx, fy - cy)
-            if dist < self.radius:
-                # How close to center? 0 = edge, 1 = bulls-eye
-                severity = max(0.0, 1.0 - (dist / self.radius))
-                return CollisionEvent(
-                    track_id     = track_id,
-                    impact_frame = i + 1,
-                    impact_point = (int(fx), int(fy)),
-                    severity     = severity,
-                )
-        return None
+        events = self.check_all({track_id: future_points})
+        return events[0] if events else None
 
     def check_all(self,
-                  tracks: dict[int, list[tuple[float, float]]]
+                  tracks: dict[int, np.ndarray]
                   ) -> list[CollisionEvent]:
         """
         Check multiple tracks at once.
 
+        Trajectories of equal length are stacked and checked together with
+        check_batch; tracks may use different horizons.
+
         Args:
-            tracks: {track_id: [future (x,y) points]}
+            tracks: {track_id: (H, 2) array or list of future (x, y) points}
 
         Returns:
             Sorted list of CollisionEvents (soonest first).
         """
-        events = []
+        by_len: dict[int, list] = {}
         for tid, pts in tracks.items():
-            ev = self.check_track(tid, pts)
-            if ev:
-                events.append(ev)
-        events.sort(key=lambda e: e.impact_frame)
+            arr = np.asarray(pts, dtype=np.float32).reshape(-1, 2)
+            by_len.setdefault(len(arr), []).append((tid, arr))
+
+        events = []
+        for group in by_len.values():
+            events += self.check_batch([tid for tid, _ in group],
+                                       np.stack([arr for _, arr in group]))
+
+        # soonest first; ties keep the caller's track order
+        order = {tid: i for i, tid in enumerate(tracks)}
+        events.sort(key=lambda e: (e.impact_frame, order[e.track_id]))
         return events
 
+    def check_batch(self,
+                    ids: list[int],
+                    P: np.ndarray
+                    ) -> list[CollisionEvent]:
+        """
+        Check a stacked batch of trajectories, e.g. straight from
+        BatchTrajectoryPredictor.
+
+        All T trajectories are tested in a single vectorized pass using
+        squared distances (no sqrt except for the severity of tracks that
+        actually hit).
+
+        Args:
+            ids: track ids, one per row of P
+            P  : (T, H, 2) predicted (x, y) positions
+
+        Returns:
+            Sorted list of CollisionEvents (soonest first).
+        """
+        if len(ids) == 0 or P.shape[1] == 0:
+            return []
+
+        cx, cy = self.zone_center
+        dx = P[..., 0] - cx
+        dy = P[..., 1] - cy
+        d2 = dx * dx + dy * dy                       # (T, H)
+
+        hit   = d2 < self.radius * self.radius
+        first = hit.argmax(axis=1)                   # first impact index
+        rows  = np.flatnonzero(hit.any(axis=1))
+        rows  = rows[np.argsort(first[rows], kind="stable")]
+
+        cols = first[rows]
+        # How close to center? 0 = edge, 1 = bulls-eye
+        severity = np.maximum(0.0, 1.0 - np.sqrt(d2[rows, cols]) / self.radius)
+        pts      = P[rows, cols]
+
+        return [
+            CollisionEvent(
+                track_id     = ids[r],
+                impact_frame = int(c) + 1,
+                impact_point = (int(px), int(py)),
+                severity     = float(sev),
+            )
+            for r, c, (px, py), sev in zip(rows, cols, pts, severity)
+        ]
+
     # ── Drawing helpers ───────────────────────────────────────────────────────
 
+    def _overlay(self, frame):
+        """Copy frame into the reused scratch buffer and return it."""
+        if self._scratch is None or self._scratch.shape != frame.shape:
+            self._scratch = np.empty_like(frame)
+        np.copyto(self._scratch, frame)
+        return self._scratch
+
     def draw_zone(self, frame, events: list[CollisionEvent]):
         """
         Draw the protected zone circle.
@@ -106,7 +158,7 @@ class SafetyMonitor:
             thickness = 3
 
             # Draw a pulsing inner fill
-            overlay = frame.copy()
+            overlay = self._overlay(frame)
             cv2.circle(overlay, (cx, cy), self.radius, color, -1)
             alpha = 0.12 + urgency * 0.12
             cv2.addWeighted(overlay, alpha, frame, 1 - alpha, 0, frame)
@@ -146,7 +198,7 @@ class SafetyMonitor:
                        f"| ACTION BLOCKED")
             txt_color = (0, 50, 255)
 
-            overlay = frame.copy()
+            overlay = self._overlay(frame)
             cv2.rectangle(overlay, (0, 36), (w_img, 70), bg, -1)
             cv2.addWeighted(overlay, 0.75, frame, 0.25, 0, frame)
             cv2.putText(
@@ -156,7 +208,7 @@ class SafetyMonitor:
             )
         else:
             # ── SAFE ────────────────────────────────────────────────────────
-            overlay = frame.copy()
+            overlay = self._overlay(frame)
             cv2.rectangle(overlay, (0, 36), (w_img, 70), (0, 60, 0), -1)
             cv2.addWeighted(overlay, 0.55, frame, 0.45, 0, frame)
             cv2.putText(
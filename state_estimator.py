@@ -13,39 +13,59 @@ This gives us smooth, noise-resistant position AND derived velocity.
 """
 
 import numpy as np
+from scipy.optimize import linear_sum_assignment
 
 
-class ObjectKalman:
-    """Single-object 4-state Kalman filter (x, y, vx, vy)."""
+# ── Shared model matrices ─────────────────────────────────────────────────────
+# Identical for every track, so they are built once and shared read-only.
+# float32 throughout: sub-pixel precision is plenty for pixel tracking.
+
+_DT = 1.0  # one frame time-step
 
-    def __init__(self, cx: float, cy: float):
-        dt = 1.0  # one frame time-step
+# State transition: x_{k} = F * x_{k-1}
+_F = np.array([
+    [1, 0, _DT,   0],
+    [0, 1,   0, _DT],
+    [0, 0,   1,   0],
+    [0, 0,   0,   1],
+], dtype=np.float32)
 
-        # State transition: x_{k} = F * x_{k-1}
-        self.F = np.array([
-            [1, 0, dt,  0],
-            [0, 1,  0, dt],
-            [0, 0,  1,  0],
-            [0, 0,  0,  1],
-        ], dtype=float)
+# Observation matrix: we only measure (x, y)
+_H = np.array([
+    [1, 0, 0, 0],
+    [0, 1, 0, 0],
+], dtype=np.float32)
 
-        # Observation matrix: we only measure (x, y)
-        self.H = np.array([
-            [1, 0, 0, 0],
-            [0, 1, 0, 0],
-        ], dtype=float)
+# Process noise covariance (how much we trust the motion model)
+_Q_VAR = 1.0
+_Q = np.eye(4, dtype=np.float32) * _Q_VAR
 
-        # Process noise covariance (how much we trust the motion model)
-        q = 1.0
-        self.Q = np.eye(4, dtype=float) * q
+# Measurement noise covariance (how noisy is the detector?)
+_R_VAR = 10.0
+_R = np.eye(2, dtype=np.float32) * _R_VAR
 
-        # Measurement noise covariance (how noisy is the detector?)
-        r = 10.0
-        self.R = np.eye(2, dtype=float) * r
+for _m in (_F, _H, _Q, _R):
+    _m.flags.writeable = False
+del _m
+
+
+class ObjectKalman:
+    """Single-object 4-state Kalman filter (x, y, vx, vy)."""
+
+    def __init__(self, cx: float, cy: float, w: int = 40, h: int = 40):
+        # Model matrices are shared module constants (not copied per track)
+        self.F = _F
+        self.H = _H
+        self.Q = _Q
+        self.R = _R
 
         # Initial state and covariance
-        self.x = np.array([[cx], [cy], [0.0], [0.0]], dtype=float)
-        self.P = np.eye(4, dtype=float) * 500.0
+        self.x = np.array([[cx], [cy], [0.0], [0.0]], dtype=np.float32)
+        self.P = np.eye(4, dtype=np.float32) * 500.0
+
+        # Last matched detection size (for drawing)
+        self.last_w = w
+        self.last_h = h
 
         # Age tracking
         self.age         = 0   # frames since created
@@ -54,22 +74,63 @@ class ObjectKalman:
 
     # ── Kalman steps ──────────────────────────────────────────────────────────
 
+    # F only adds dt·v to position and H only selects (x, y), so both steps
+    # are written out in closed form below instead of generic matmul / inv.
+
     def predict(self):
-        self.x = self.F @ self.x
-        self.P = self.F @ self.P @ self.F.T + self.Q
+        # x = F x
+        x = self.x
+        x[0, 0] += _DT * x[2, 0]
+        x[1, 0] += _DT * x[3, 0]
+
+        # P = F P Fᵀ + Q
+        (p00, p01, p02, p03), \
+        (p10, p11, p12, p13), \
+        (p20, p21, p22, p23), \
+        (p30, p31, p32, p33) = self.P.tolist()
+
+        # rows of F P
+        a00, a01, a02, a03 = p00 + _DT * p20, p01 + _DT * p21, p02 + _DT * p22, p03 + _DT * p23
+        a10, a11, a12, a13 = p10 + _DT * p30, p11 + _DT * p31, p12 + _DT * p32, p13 + _DT * p33
+
+        self.P[:] = (
+            (a00 + _DT * a02 + _Q_VAR, a01 + _DT * a03,          a02,          a03),
+            (a10 + _DT * a12,          a11 + _DT * a13 + _Q_VAR, a12,          a13),
+            (p20 + _DT * p22,          p21 + _DT * p23,          p22 + _Q_VAR, p23),
+            (p30 + _DT * p32,          p31 + _DT * p33,          p32,          p33 + _Q_VAR),
+        )
         self.missed += 1
         self.age    += 1
         return self.x.flatten()
 
-    def update(self, cx: float, cy: float):
-        z = np.array([[cx], [cy]], dtype=float)
+    def update(self, cx: float, cy: float, w: int, h: int):
+        self.last_w = w
+        self.last_h = h
+
+        P = self.P.tolist()
+        (p00, p01, _, _), (p10, p11, _, _) = P[0], P[1]
+
+        # innovation covariance S = H P Hᵀ + R (2×2) and its inverse
+        s00, s01 = p00 + _R_VAR, p01
+        s10, s11 = p10,          p11 + _R_VAR
+        det = s00 * s11 - s01 * s10
+        i00, i01 =  s11 / det, -s01 / det
+        i10, i11 = -s10 / det,  s00 / det
+
+        # Kalman gain K = P Hᵀ S⁻¹ (4×2)
+        K = [(pi0 * i00 + pi1 * i10, pi0 * i01 + pi1 * i11) for pi0, pi1, _, _ in P]
+
+        # innovation y = z - H x
+        x  = self.x
+        y0 = cx - x[0, 0]
+        y1 = cy - x[1, 0]
 
-        S = self.H @ self.P @ self.H.T + self.R          # innovation covariance
-        K = self.P @ self.H.T @ np.linalg.inv(S)         # Kalman gain
-        y = z - self.H @ self.x                           # innovation
+        # x = x + K y ;  P = (I - K H) P = P - K (rows 0, 1 of P)
+        row0, row1 = P[0], P[1]
+        for i, (k0, k1) in enumerate(K):
+            x[i, 0] += k0 * y0 + k1 * y1
+            self.P[i] = [P[i][j] - k0 * row0[j] - k1 * row1[j] for j in range(4)]
 
-        self.x = self.x + K @ y
-        self.P = (np.eye(4) - K @ self.H) @ self.P
         self.missed = 0
         return self.x.flatten()
 
@@ -98,7 +159,8 @@ class ObjectKalman:
 class StateEstimator:
     """
     Maintains a pool of ObjectKalman filters.
-    Matches incoming detections to existing tracks by nearest-centroid distance.
+    Matches incoming detections to existing tracks by optimal (Hungarian)
+    assignment on centroid distance, gated by max_distance.
     """
 
     def __init__(self, max_distance: float = 80.0):
@@ -121,31 +183,30 @@ class StateEstimator:
         for t in self.tracks:
             t.predict()
 
-        # 2. Match detections to tracks (greedy nearest-neighbour)
-        matched_track_idx = set()
-        matched_det_idx   = set()
+        # 2. Match detections to tracks (Hungarian assignment, gated)
+        matched_det_idx = set()
 
-        for di, (cx, cy, w, h) in enumerate(detections):
-            best_dist  = self.max_distance
-            best_tidx  = -1
-            for ti, track in enumerate(self.tracks):
-                if ti in matched_track_idx:
+        if self.tracks and detections:
+            track_xy = np.array([t.position for t in self.tracks], dtype=np.float32)
+            det_xy   = np.array([(cx, cy) for cx, cy, _, _ in detections], dtype=np.float32)
+
+            # T×D Euclidean cost matrix; pairs outside the gate are forbidden
+            cost = np.linalg.norm(track_xy[:, None, :] - det_xy[None, :, :], axis=2)
+            gated = cost >= self.max_distance
+            cost[gated] = 1e6
+
+            row_ind, col_ind = linear_sum_assignment(cost)
+            for ti, di in zip(row_ind, col_ind):
+                if gated[ti, di]:
                     continue
-                tx, ty = track.position
-                dist = np.hypot(cx - tx, cy - ty)
-                if dist < best_dist:
-                    best_dist = dist
-                    best_tidx = ti
-
-            if best_tidx >= 0:
-                self.tracks[best_tidx].update(cx, cy)
-                matched_track_idx.add(best_tidx)
+                _, _, w, h = detections[di]
+                self.tracks[ti].update(*det_xy[di], w, h)
                 matched_det_idx.add(di)
 
         # 3. Birth new tracks for unmatched detections
         for di, (cx, cy, w, h) in enumerate(detections):
             if di not in matched_det_idx:
-                self.tracks.append(ObjectKalman(cx, cy))
+                self.tracks.append(ObjectKalman(cx, cy, w, h))
                 self.track_ids.append(self._next_id)
                 self._next_id += 1
 
@@ -154,22 +215,11 @@ class StateEstimator:
         self.tracks    = [a[0] for a in alive]
         self.track_ids = [a[1] for a in alive]
 
-        # 5. Build detection-size lookup (last seen w/h per track)
-        det_map = {(round(cx), round(cy)): (w, h) for (cx, cy, w, h) in detections}
-
-        # 6. Return state dicts for all live tracks
+        # 5. Return state dicts for all live tracks
         results = []
         for track, tid in zip(self.tracks, self.track_ids):
             px, py = track.position
             vx, vy = track.velocity
-            # find closest detection for w/h
-            best_wh = (40, 40)
-            best_d  = 9999
-            for (dcx, dcy), (dw, dh) in det_map.items():
-                d = np.hypot(px - dcx, py - dcy)
-                if d < best_d:
-                    best_d  = d
-                    best_wh = (dw, dh)
 
             results.append({
                 "id":    tid,
@@ -178,8 +228,8 @@ class StateEstimator:
                 "vx":    vx,
                 "vy":    vy,
                 "speed": track.speed,
-                "w":     best_wh[0],
-                "h":     best_wh[1],
+                "w":     track.last_w,
+                "h":     track.last_h,
                 "age":   track.age,
             })
 
@@ -6,6 +6,32 @@ deterministic object detection without a neural network.
 """
 
 import cv2
+import numpy as np
+
+
+def _build_mask_graph(kernel):
+    """
+    Compile threshold → open → dilate into a single G-API graph so the
+    mask cleanup runs as one call per frame with buffers reused between
+    nodes. Returns None when this OpenCV build has no G-API.
+    """
+    if not hasattr(cv2, "gapi"):
+        return None
+
+    g_in   = cv2.GMat()
+    g_mask = cv2.gapi.threshold(g_in, cv2.GScalar((200.0,)), cv2.GScalar((255.0,)),
+                                cv2.THRESH_BINARY)
+    g_mask = cv2.gapi.morphologyEx(g_mask, cv2.MORPH_OPEN, kernel)
+    g_mask = cv2.gapi.morphologyEx(g_mask, cv2.MORPH_DILATE, kernel)
+    return cv2.GComputation(cv2.GIn(g_in), cv2.GOut(g_mask))
+
+
+def _cuda_available() -> bool:
+    """True when OpenCV was built with CUDA and a device is present (e.g. Jetson)."""
+    try:
+        return cv2.cuda.getCudaEnabledDeviceCount() > 0
+    except (AttributeError, cv2.error):
+        return False
 
 
 class MotionTracker:
@@ -17,23 +43,60 @@ class MotionTracker:
             history=500, varThreshold=25, detectShadows=True
         )
 
-    def detect(self, frame):
+        # Morphology kernel is constant — build it once, not every frame
+        self.kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
+
+        # Mask cleanup pipeline (None → plain per-call OpenCV fallback)
+        self._mask_graph = _build_mask_graph(self.kernel)
+
+        # Per-frame mask buffers, allocated on the first frame and reused.
+        # The G-API graph allocates its own output, so _mask_buf is only
+        # used by the plain OpenCV fallback and the CUDA download.
+        self._buf_shape = None
+        self._fg_buf    = None
+        self._mask_buf  = None
+
+        # CUDA path: MOG2 + threshold + morphology on the GPU, one upload
+        # and one download per frame. Only findContours stays on the CPU.
+        self.use_cuda = _cuda_available()
+        if self.use_cuda:
+            self.cu_mog = cv2.cuda.createBackgroundSubtractorMOG2(500, 25, True)
+            self.cu_morph_open = cv2.cuda.createMorphologyFilter(
+                cv2.MORPH_OPEN, cv2.CV_8UC1, self.kernel)
+            self.cu_morph_dil = cv2.cuda.createMorphologyFilter(
+                cv2.MORPH_DILATE, cv2.CV_8UC1, self.kernel)
+            self._stream    = cv2.cuda.Stream()
+            self._gpu_frame = cv2.cuda.GpuMat()
+            self._gpu_fg    = cv2.cuda.GpuMat()
+            self._gpu_bin   = cv2.cuda.GpuMat()
+            self._gpu_open  = cv2.cuda.GpuMat()
+            self._gpu_mask  = cv2.cuda.GpuMat()
+
+    def detect(self, frame, return_mask: bool = True):
         """
         Apply background subtraction and find moving object blobs.
 
+        Args:
+            return_mask : hand back the cleaned mask (debug display only);
+                          pass False when it isn't shown to skip the copy
+
         Returns:
             objects : list of (cx, cy, w, h) for each detected blob
-            mask    : binary mask image (useful for debug display)
+            mask    : binary mask image owned by the caller, or None when
+                      return_mask is False
         """
-        mask = self.bg.apply(frame)
-
-        # Remove shadows (gray pixels → 127) to get binary foreground only
-        _, mask = cv2.threshold(mask, 200, 255, cv2.THRESH_BINARY)
+        shape = frame.shape[:2]
+        if shape != self._buf_shape:
+            self._buf_shape = shape
+            if not self.use_cuda:
+                self._fg_buf = np.empty(shape, np.uint8)
+            if self.use_cuda or self._mask_graph is None:
+                self._mask_buf = np.empty(shape, np.uint8)
 
-        # Morphological cleanup: remove small noise, fill gaps
-        kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (5, 5))
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)   # remove noise
-        mask = cv2.morphologyEx(mask, cv2.MORPH_DILATE, kernel)  # fill gaps
+        if self.use_cuda:
+            mask = self._mask_cuda(frame)
+        else:
+            mask = self._mask_cpu(frame)
 
         contours, _ = cv2.findContours(
             mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE
@@ -47,4 +110,42 @@ class MotionTracker:
                 cy = y + h // 2
                 objects.append((cx, cy, w, h))
 
+        if not return_mask:
+            return objects, None
+        if mask is self._mask_buf:
+            mask = mask.copy()   # buffer is overwritten on the next call
         return objects, mask
+
+    # ── Mask backends ─────────────────────────────────────────────────────────
+
+    def _mask_cpu(self, frame):
+        fg = self.bg.apply(frame, fgmask=self._fg_buf)
+
+        if self._mask_graph is not None:
+            return self._mask_graph.apply(cv2.gin(fg))
+
+        mask = self._mask_buf
+
+        # Remove shadows (gray pixels → 127) to get binary foreground only
+        cv2.threshold(fg, 200, 255, cv2.THRESH_BINARY, dst=mask)
+
+        # Morphological cleanup: remove small noise, fill gaps
+        cv2.morphologyEx(mask, cv2.MORPH_OPEN, self.kernel, dst=mask)    # remove noise
+        cv2.morphologyEx(mask, cv2.MORPH_DILATE, self.kernel, dst=mask)  # fill gaps
+        return mask
+
+    def _mask_cuda(self, frame):
+        stream = self._stream
+        self._gpu_frame.upload(frame, stream)
+
+        # learningRate=-1 → automatic, same as the CPU subtractor
+        self.cu_mog.apply(self._gpu_frame, -1.0, stream, self._gpu_fg)
+        cv2.cuda.threshold(self._gpu_fg, 200, 255, cv2.THRESH_BINARY,
+                           self._gpu_bin, stream)
+        self.cu_morph_open.apply(self._gpu_bin, self._gpu_open, stream)
+        self.cu_morph_dil.apply(self._gpu_open, self._gpu_mask, stream)
+
+        # Async copy back into the host buffer; wait only before contouring
+        self._gpu_mask.download(stream, self._mask_buf)
+        stream.waitForCompletion()
+        return self._mask_buf